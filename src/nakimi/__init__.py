@@ -8,9 +8,16 @@ __version__ = "2.0.0"
 __author__ = "Andre Pitanga"
 __license__ = "MIT"
 
-# Core
-from .core import Vault, VaultConfig, get_config
-from .core.plugin import Plugin, PluginManager, PluginError
+# Core exports are imported on first attribute access (PEP 562) so that
+# "import nakimi" stays cheap; the submodules are only loaded when needed.
+_LAZY_EXPORTS = {
+    "Vault": ".core",
+    "VaultConfig": ".core",
+    "get_config": ".core",
+    "Plugin": ".core.plugin",
+    "PluginManager": ".core.plugin",
+    "PluginError": ".core.plugin",
+}
 
 # Plugins are imported from their subpackages
 # from .plugins.gmail import GmailPlugin
@@ -23,3 +30,17 @@ __all__ = [
     "PluginManager",
     "PluginError",
 ]
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        from importlib import import_module
+
+        value = getattr(import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
@@ -4,12 +4,13 @@ Main CLI entry point for Nakimi
 Provides plugin-based command execution and vault management.
 """
 
-import argparse
 import json
 import os
 import subprocess
 import sys
 from pathlib import Path
+from types import SimpleNamespace
+from typing import Optional
 
 from nakimi.core import Vault, get_config, secure_delete
 from nakimi.core.plugin import PluginManager, PluginError
@@ -43,6 +44,19 @@ def get_secrets_path() -> Path:
     return config.secrets_file
 
 
+def _load_json(path: Path):
+    """Read a JSON file in one read() and decode it"""
+    return json.loads(Path(path).read_bytes())
+
+
+def _parse_secrets(path: Path) -> dict:
+    """Read and validate a plaintext secrets JSON file"""
+    data = _load_json(path)
+    if not isinstance(data, dict):
+        raise PluginError(f"Secrets file {path} must contain a JSON object")
+    return data
+
+
 def load_secrets() -> dict:
     """Load and parse secrets JSON"""
     secrets_path = get_secrets_path()
@@ -58,14 +72,12 @@ def load_secrets() -> dict:
         vault = Vault()
         temp_path = vault.decrypt(secrets_path)
         try:
-            with open(temp_path, "r") as f:
-                return json.load(f)
+            return _parse_secrets(temp_path)
         finally:
             secure_delete(temp_path)
     else:
         # Plaintext JSON
-        with open(secrets_path, "r") as f:
-            return json.load(f)
+        return _parse_secrets(secrets_path)
 
 
 def cmd_init(args):
@@ -141,25 +153,31 @@ def cmd_plugins(args):
     # Auto-discover plugins
     manager.discover_plugins()
 
+    # Collect the listing and write it in one call rather than a print per line
+    out = []
     if args.command == "list":
         plugins = manager.list_plugins()
         if plugins:
-            print("Loaded plugins:")
+            out.append("Loaded plugins:\n")
             for name in plugins:
                 plugin = manager.get_plugin(name)
-                print(f"  • {name:15} - {plugin.description}")
+                out.append(f"  • {name:15} - {plugin.description}\n")
         else:
-            print("No plugins loaded.")
-            print("Add credentials to your secrets.json to enable plugins.")
+            out.append("No plugins loaded.\n")
+            out.append("Add credentials to your secrets.json to enable plugins.\n")
 
     elif args.command == "commands":
         commands = manager.list_commands()
         if commands:
-            print("Available commands:")
+            out.append("Available commands:\n")
             for cmd in sorted(commands):
-                print(f"  {cmd}")
+                out.append(f"  {cmd}\n")
         else:
-            print("No commands available.")
+            out.append("No commands available.\n")
+
+    if out:
+        sys.stdout.write("".join(out))
+        sys.stdout.flush()
 
 
 def cmd_run(args):
@@ -269,8 +287,7 @@ def cmd_session(args):  # noqa: C901
 
     # Show available plugins
     try:
-        with open(temp_secrets, "r") as f:
-            secrets = json.load(f)
+        secrets = _parse_secrets(temp_secrets)
         manager = PluginManager(secrets)
         manager.discover_plugins()
 
@@ -512,53 +529,11 @@ def cmd_yubikey(args):  # noqa: C901
         sys.exit(1)
 
 
-def main():
-    # Check for plugin command BEFORE setting up argparse
-    # This allows plugin commands like "gmail.unread" to work
-    if len(sys.argv) > 1 and "." in sys.argv[1] and not sys.argv[1].startswith("-"):
-        plugin_cmd = sys.argv[1]
-        if "." in plugin_cmd:
-            parts = plugin_cmd.split(".", 1)
-
-            # Create minimal args object for cmd_run
-            class Args:
-                pass
-
-            args = Args()
-            args.plugin = parts[0]
-            args.command = parts[1]
-            args.args = sys.argv[2:]
-            return cmd_run(args)
-
-    parser = argparse.ArgumentParser(
-        prog="nakimi",
-        description="Secure vault for API credentials with plugin-based integrations",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-Examples:
-  %(prog)s init                          # Initialize vault
-  %(prog)s session                       # Start secure session
-  %(prog)s gmail.unread                  # List unread emails
-  %(prog)s gmail.search "from:boss"      # Search emails
-  %(prog)s plugins list                  # List available plugins
-  %(prog)s upgrade                       # Upgrade to latest version
-
-YubiKey commands (optional):
-  %(prog)s yubikey setup                 # Initialize YubiKey
-  %(prog)s yubikey status                # Check YubiKey status
-  %(prog)s yubikey encrypt-key           # Encrypt age key with YubiKey
-        """,
-    )
-
-    # Add version flag
-    parser.add_argument("--version", "-v", action="store_true", help="Show version information")
-
-    subparsers = parser.add_subparsers(dest="cmd", help="Commands")
-
-    # init command
+def _add_init(subparsers):
     subparsers.add_parser("init", help="Initialize vault and generate keys")
 
-    # encrypt command
+
+def _add_encrypt(subparsers):
     encrypt_parser = subparsers.add_parser("encrypt", help="Encrypt a file")
     encrypt_parser.add_argument("file", help="File to encrypt")
     encrypt_parser.add_argument("-o", "--output", help="Output file")
@@ -566,26 +541,32 @@ YubiKey commands (optional):
         "--shred", action="store_true", help="Securely delete original after encryption"
     )
 
-    # decrypt command
+
+def _add_decrypt(subparsers):
     decrypt_parser = subparsers.add_parser("decrypt", help="Decrypt a file")
     decrypt_parser.add_argument("file", help="File to decrypt")
     decrypt_parser.add_argument("-o", "--output", help="Output file")
     decrypt_parser.add_argument("--keep", action="store_true", help="Keep decrypted file")
 
-    # plugins command
+
+def _add_plugins(subparsers):
     plugins_parser = subparsers.add_parser("plugins", help="Manage plugins")
     plugins_sub = plugins_parser.add_subparsers(dest="command", help="Plugin commands")
     plugins_sub.add_parser("list", help="List available plugins")
     plugins_sub.add_parser("commands", help="List available commands")
 
-    # session command
+
+def _add_session(subparsers):
+    import argparse
+
     session_parser = subparsers.add_parser("session", help="Start secure session")
     session_parser.add_argument("--shell", action="store_true", help="Start shell instead of kimi")
     session_parser.add_argument(
         "--exec", dest="command", nargs=argparse.REMAINDER, help="Execute command and exit"
     )
 
-    # yubikey command
+
+def _add_yubikey(subparsers):
     yubikey_parser = subparsers.add_parser("yubikey", help="YubiKey management and operations")
     yubikey_sub = yubikey_parser.add_subparsers(dest="yubikey_command", help="YubiKey commands")
 
@@ -614,17 +595,205 @@ YubiKey commands (optional):
     change_parser.add_argument("old_pin", help="Current PIN")
     change_parser.add_argument("new_pin", help="New PIN")
 
-    # serve command (MCP server)
+
+def _add_serve(subparsers):
     subparsers.add_parser("serve", help="Start MCP server for AI assistant integration")
 
-    # upgrade command
+
+def _add_upgrade(subparsers):
     upgrade_parser = subparsers.add_parser("upgrade", help="Upgrade to latest version from GitHub")
     upgrade_parser.add_argument(
         "--version", dest="target_version", help="Specific version to upgrade to (default: latest)"
     )
 
-    # plugin command (direct invocation: nakimi gmail.unread)
-    # This is handled specially below
+
+# Subparser builders, in the order they appear in --help
+SUBPARSER_BUILDERS = {
+    "init": _add_init,
+    "encrypt": _add_encrypt,
+    "decrypt": _add_decrypt,
+    "plugins": _add_plugins,
+    "session": _add_session,
+    "yubikey": _add_yubikey,
+    "serve": _add_serve,
+    "upgrade": _add_upgrade,
+}
+
+
+def _sniff_subcommand(argv):
+    """Return the first non-flag token in argv, or None if top-level help comes first"""
+    for token in argv:
+        if token in ("-h", "--help"):
+            return None
+        if not token.startswith("-"):
+            return token
+    return None
+
+
+def _build_parser(argv):
+    """
+    Build the argument parser.
+
+    Only the subparser for the subcommand named in argv is constructed.
+    All subparsers are built for top-level --help, no arguments, or an
+    unknown command so that usage and error messages list every command.
+    """
+    # Imported here: argparse (and gettext) are only needed off the fast path
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="nakimi",
+        description="Secure vault for API credentials with plugin-based integrations",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s init                          # Initialize vault
+  %(prog)s session                       # Start secure session
+  %(prog)s gmail.unread                  # List unread emails
+  %(prog)s gmail.search "from:boss"      # Search emails
+  %(prog)s plugins list                  # List available plugins
+  %(prog)s upgrade                       # Upgrade to latest version
+
+YubiKey commands (optional):
+  %(prog)s yubikey setup                 # Initialize YubiKey
+  %(prog)s yubikey status                # Check YubiKey status
+  %(prog)s yubikey encrypt-key           # Encrypt age key with YubiKey
+        """,
+    )
+
+    # Add version flag
+    parser.add_argument("--version", "-v", action="store_true", help="Show version information")
+
+    subparsers = parser.add_subparsers(dest="cmd", help="Commands")
+
+    # Plugin commands (direct invocation: nakimi gmail.unread) are handled
+    # before the parser is built, see main()
+    subcommand = _sniff_subcommand(argv)
+    if subcommand in SUBPARSER_BUILDERS:
+        SUBPARSER_BUILDERS[subcommand](subparsers)
+    else:
+        for add_subparser in SUBPARSER_BUILDERS.values():
+            add_subparser(subparsers)
+
+    return parser
+
+
+# Route to appropriate handler
+COMMAND_HANDLERS = {
+    "init": cmd_init,
+    "encrypt": cmd_encrypt,
+    "decrypt": cmd_decrypt,
+    "plugins": cmd_plugins,
+    "session": cmd_session,
+    "upgrade": cmd_upgrade,
+    "serve": cmd_serve,
+    "yubikey": cmd_yubikey,
+}
+
+
+class _UseArgparse(Exception):
+    """Raised by the fast path when argv needs the full argparse parser"""
+
+
+def _pop_flag(argv, names) -> bool:
+    """Remove a boolean flag from argv and return whether it was present"""
+    found = False
+    for name in names:
+        while name in argv:
+            argv.remove(name)
+            found = True
+    return found
+
+
+def _pop_option(argv, names) -> Optional[str]:
+    """Remove an option and its value from argv and return the value, if present"""
+    for name in names:
+        if name in argv:
+            index = argv.index(name)
+            if index + 1 >= len(argv) or argv[index + 1].startswith("-"):
+                raise _UseArgparse
+            value = argv[index + 1]
+            del argv[index : index + 2]
+            return value
+    return None
+
+
+def _fast_file_args(command, rest, flag):
+    """Parse '<file> [-o OUTPUT] [--<flag>]' for encrypt/decrypt"""
+    output = _pop_option(rest, ("-o", "--output"))
+    flag_value = _pop_flag(rest, (f"--{flag}",))
+    if len(rest) != 1 or rest[0].startswith("-"):
+        raise _UseArgparse
+    return SimpleNamespace(**{"cmd": command, "file": rest.pop(), "output": output, flag: flag_value})
+
+
+def _fast_args(command, rest):
+    """Build the args namespace for a built-in command, consuming tokens from rest"""
+    if command in ("init", "serve"):
+        return SimpleNamespace(cmd=command)
+    if command == "plugins" and rest in (["list"], ["commands"]):
+        return SimpleNamespace(cmd=command, command=rest.pop())
+    if command == "encrypt":
+        return _fast_file_args(command, rest, "shred")
+    if command == "decrypt":
+        return _fast_file_args(command, rest, "keep")
+    if command == "upgrade":
+        return SimpleNamespace(cmd=command, target_version=_pop_option(rest, ("--version",)))
+    raise _UseArgparse
+
+
+def _fast_dispatch(argv) -> bool:
+    """
+    Run a built-in command without constructing an argparse parser.
+
+    Handles the plain forms of init, serve, plugins, encrypt, decrypt,
+    upgrade and --version. Returns False for anything else (help, session,
+    yubikey, unknown or malformed arguments) so that main() falls back to
+    argparse, which also produces the usage errors.
+    """
+    if not argv:
+        return False
+
+    if argv in (["--version"], ["-v"]):
+        cmd_version()
+        sys.exit(0)
+
+    command, rest = argv[0], list(argv[1:])
+    try:
+        args = _fast_args(command, rest)
+    except _UseArgparse:
+        return False
+
+    # Leftover tokens (unknown flags, extra arguments) need argparse
+    if rest:
+        return False
+
+    COMMAND_HANDLERS[command](args)
+    return True
+
+
+def main():
+    # Check for plugin command BEFORE setting up argparse
+    # This allows plugin commands like "gmail.unread" to work
+    if len(sys.argv) > 1 and "." in sys.argv[1] and not sys.argv[1].startswith("-"):
+        plugin_cmd = sys.argv[1]
+        if "." in plugin_cmd:
+            parts = plugin_cmd.split(".", 1)
+
+            # Create minimal args object for cmd_run
+            class Args:
+                pass
+
+            args = Args()
+            args.plugin = parts[0]
+            args.command = parts[1]
+            args.args = sys.argv[2:]
+            return cmd_run(args)
+
+    if _fast_dispatch(sys.argv[1:]):
+        return
+
+    parser = _build_parser(sys.argv[1:])
 
     args, remaining = parser.parse_known_args()
 
@@ -638,18 +807,7 @@ YubiKey commands (optional):
         sys.exit(1)
 
     # Route to appropriate handler
-    handlers = {
-        "init": cmd_init,
-        "encrypt": cmd_encrypt,
-        "decrypt": cmd_decrypt,
-        "plugins": cmd_plugins,
-        "session": cmd_session,
-        "upgrade": cmd_upgrade,
-        "serve": cmd_serve,
-        "yubikey": cmd_yubikey,
-    }
-
-    handler = handlers.get(args.cmd)
+    handler = COMMAND_HANDLERS.get(args.cmd)
     if handler:
         handler(args)
     else:
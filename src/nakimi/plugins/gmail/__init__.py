@@ -1,6 +1,25 @@
 """Gmail plugin for Nakimi"""
 
-from .plugin import GmailPlugin
-from .client import GmailClient, GmailAuthError
+# Imported on first attribute access (PEP 562) so that importing the
+# package does not load the plugin and client modules up front.
+_LAZY_EXPORTS = {
+    "GmailPlugin": ".plugin",
+    "GmailClient": ".client",
+    "GmailAuthError": ".client",
+}
 
 __all__ = ["GmailPlugin", "GmailClient", "GmailAuthError"]
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        from importlib import import_module
+
+        value = getattr(import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
@@ -7,20 +7,100 @@ and provides methods for common email operations.
 
 import sys
 import base64
-from datetime import datetime
-from email.mime.text import MIMEText
-from typing import Optional, List, Dict, Any
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any, Tuple
+
+# Google libraries are imported lazily (see _lazy_import_google) so that
+# importing this module doesn't pull in httplib2, protobuf and the discovery
+# machinery for commands that never talk to Gmail.
+GOOGLE_LIBS_AVAILABLE: Optional[bool] = None
+_Credentials = None
+_Request = None
+_build_from_document = None
+_HttpError = None
+_gmail_discovery_doc: Optional[str] = None
+
+
+# Credentials shared by GmailClient instances in the same process, keyed by
+# (credentials fingerprint, scopes), so that a new client reuses a still-valid
+# access token. Services are not shared: each client builds its own, with its
+# own httplib2.Http, because httplib2 connections are not thread-safe.
+_CREDENTIALS_CACHE: Dict[Tuple[str, Tuple[str, ...]], Any] = {}
+_CREDENTIALS_CACHE_LOCK = threading.Lock()
+
+# Serializes access-token refreshes; credentials are shared between clients
+# via _CREDENTIALS_CACHE and between the MCP server's worker threads
+_TOKEN_REFRESH_LOCK = threading.Lock()
+
+
+def _lazy_import_google() -> bool:
+    """Import the Google API libraries on first use and cache the symbols"""
+    global GOOGLE_LIBS_AVAILABLE, _Credentials, _Request, _build_from_document, _HttpError
+
+    if GOOGLE_LIBS_AVAILABLE is not None:
+        return GOOGLE_LIBS_AVAILABLE
+
+    try:
+        from google.oauth2.credentials import Credentials
+        from google.auth.transport.requests import Request
+        from googleapiclient.discovery import build_from_document
+        from googleapiclient.errors import HttpError
+    except ImportError:
+        GOOGLE_LIBS_AVAILABLE = False
+        return False
+
+    _Credentials, _Request, _HttpError = Credentials, Request, HttpError
+    _build_from_document = build_from_document
+    GOOGLE_LIBS_AVAILABLE = True
+    return True
 
-# Google libraries
-try:
-    from google.oauth2.credentials import Credentials
-    from google.auth.transport.requests import Request
-    from googleapiclient.discovery import build
-    from googleapiclient.errors import HttpError
 
-    GOOGLE_LIBS_AVAILABLE = True
-except ImportError:
-    GOOGLE_LIBS_AVAILABLE = False
+def _utcnow() -> datetime:
+    """Current UTC time as a naive datetime, matching google-auth's Credentials.expiry"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _get_gmail_discovery_doc() -> str:
+    """Return the Gmail discovery document bundled with googleapiclient, loaded once"""
+    global _gmail_discovery_doc
+    if _gmail_discovery_doc is None:
+        from googleapiclient.discovery_cache import get_static_doc
+
+        _gmail_discovery_doc = get_static_doc("gmail", "v1")
+    return _gmail_discovery_doc
+
+
+# RFC 5322 limit on the length of a header line, excluding CRLF
+MAX_HEADER_LINE = 998
+
+
+def _encode_header(name: str, value: str) -> str:
+    """RFC 2047-encode a header value if it is not plain ASCII, folding it if long"""
+    if value.isascii() and len(name) + 2 + len(value) <= 78:
+        return value
+    from email.header import Header
+
+    charset = "us-ascii" if value.isascii() else "utf-8"
+    return Header(value, charset, header_name=name).encode(linesep="\r\n")
+
+
+def _encode_addresses(name: str, value: str) -> str:
+    """Encode non-ASCII display names in an address list, leaving addresses intact"""
+    if value.isascii():
+        return value
+    from email.utils import formataddr, getaddresses
+
+    pairs = getaddresses([value])
+    try:
+        if all(addr for _, addr in pairs):
+            return ", ".join(formataddr(pair, charset="utf-8") for pair in pairs)
+    except UnicodeEncodeError:
+        pass
+    # Non-ASCII or unparseable addr-spec: encode the whole value, as MIMEText did
+    return _encode_header(name, value)
 
 
 class GmailAuthError(Exception):
@@ -39,6 +119,12 @@ class GmailClient:
         "https://www.googleapis.com/auth/gmail.compose",
     ]
 
+    # Refresh the access token when it expires within this many seconds
+    TOKEN_REFRESH_MARGIN = 300
+
+    # Sub-requests per batch HTTP request; Gmail rate-limits batches above 50
+    BATCH_SIZE = 50
+
     def __init__(self, secrets: Dict[str, str]):
         """
         Initialize Gmail client with secrets.
@@ -46,7 +132,7 @@ class GmailClient:
         Args:
             secrets: Dictionary with keys: client_id, client_secret, refresh_token
         """
-        if not GOOGLE_LIBS_AVAILABLE:
+        if not _lazy_import_google():
             raise ImportError(
                 "Google API libraries not installed. "
                 "Run: pip install google-auth google-auth-oauthlib "
@@ -54,9 +140,11 @@ class GmailClient:
             )
 
         self.secrets = secrets
-        self.creds: Optional[Credentials] = None
+        self.creds = None
         self.service = None
         self._auth_error: Optional[str] = None
+        # time.monotonic() value until which the token needs no expiry check
+        self._valid_until_mono = 0.0
 
         self._validate_secrets()
         self._authenticate()
@@ -70,46 +158,107 @@ class GmailClient:
 
     def _authenticate(self):
         """Authenticate using secrets"""
+        cache_key = (self._token_fingerprint(), tuple(self.SCOPES))
         try:
-            self.creds = Credentials(
-                token=None,
-                refresh_token=self.secrets["refresh_token"],
-                token_uri="https://oauth2.googleapis.com/token",
-                client_id=self.secrets["client_id"],
-                client_secret=self.secrets["client_secret"],
-                scopes=self.SCOPES,
-            )
+            with _CREDENTIALS_CACHE_LOCK:
+                self.creds = _CREDENTIALS_CACHE.get(cache_key)
+                if self.creds is None:
+                    self.creds = _Credentials(
+                        token=None,
+                        refresh_token=self.secrets["refresh_token"],
+                        token_uri="https://oauth2.googleapis.com/token",
+                        client_id=self.secrets["client_id"],
+                        client_secret=self.secrets["client_secret"],
+                        scopes=self.SCOPES,
+                    )
+                    _CREDENTIALS_CACHE[cache_key] = self.creds
 
-            # Initial token refresh
-            self.creds.refresh(Request())
+            # The access token is kept in memory only (never written to disk),
+            # so the first client in a process always refreshes
+            if self._token_is_stale():
+                self._refresh_token()
 
-            # Build Gmail service
-            self.service = build("gmail", "v1", credentials=self.creds, static_discovery=False)
+            # Build this client's Gmail service from the discovery document
+            # bundled with googleapiclient, loaded once per process
+            self.service = _build_from_document(_get_gmail_discovery_doc(), credentials=self.creds)
 
+        except GmailAuthError:
+            raise
         except Exception as e:
             error_msg = str(e)
             if "invalid_grant" in error_msg:
                 error_msg = "Refresh token expired or revoked. Need to re-authorize."
             raise GmailAuthError(f"Authentication failed: {error_msg}")
 
+    def _token_fingerprint(self) -> str:
+        """Identify the account credentials belong to without using the refresh token as a key"""
+        material = f"{self.secrets['client_id']}:{self.secrets['refresh_token']}"
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _token_is_stale(self) -> bool:
+        """Whether the access token is missing, invalid, or expires within 5 minutes"""
+        if not self.creds.token or not self.creds.expiry:
+            return True
+        expires_in = (self.creds.expiry - _utcnow()).total_seconds()
+        return not self.creds.valid or expires_in < self.TOKEN_REFRESH_MARGIN
+
+    def _mark_token_valid(self):
+        """Record on the monotonic clock how long the current token can be used unchecked"""
+        if not self.creds.expiry:
+            return
+        remaining = (self.creds.expiry - _utcnow()).total_seconds() - self.TOKEN_REFRESH_MARGIN
+        self._valid_until_mono = time.monotonic() + max(0.0, remaining)
+
+    def _refresh_token(self, rejected_token: Optional[str] = None):
+        """
+        Fetch a new access token.
+
+        Pass rejected_token, the token an API call failed with, to refresh
+        even if the current token looks valid. The refresh is skipped if
+        another thread already replaced the token while this one waited.
+        """
+        with _TOKEN_REFRESH_LOCK:
+            if rejected_token is None:
+                already_fresh = not self._token_is_stale()
+            else:
+                already_fresh = self.creds.token != rejected_token
+            if already_fresh:
+                self._mark_token_valid()
+                return
+            try:
+                self.creds.refresh(_Request())
+            except Exception as e:
+                error_msg = str(e)
+                if "invalid_grant" in error_msg:
+                    error_msg = "Refresh token expired or revoked. Need to re-authorize."
+                raise GmailAuthError(f"Authentication failed: {error_msg}")
+            self._mark_token_valid()
+
     def _ensure_valid_token(self):
         """Refresh token if expired or about to expire"""
+        # Fast path: token already known to be good for a while
+        if time.monotonic() < self._valid_until_mono:
+            return
+
         if not self.creds:
             return
 
-        if self.creds.expiry:
-            expires_in = (self.creds.expiry - datetime.utcnow()).total_seconds()
-            if not self.creds.valid or expires_in < 300:
-                self.creds.refresh(Request())
+        if self._token_is_stale():
+            self._refresh_token()
+        else:
+            self._mark_token_valid()
 
     def _execute_with_retry(self, api_call, *args, **kwargs):
         """Execute API call with automatic token refresh on 401"""
+        token = self.creds.token
         try:
             return api_call(*args, **kwargs)
-        except HttpError as e:
+        except _HttpError as e:
             if hasattr(e, "resp") and e.resp.status == 401:
                 try:
-                    self._ensure_valid_token()
+                    # The token may have been revoked while still looking valid
+                    # (e.g. one shared through _CREDENTIALS_CACHE), so refresh it
+                    self._refresh_token(rejected_token=token)
                     return api_call(*args, **kwargs)
                 except GmailAuthError:
                     return None
@@ -125,199 +274,115 @@ class GmailClient:
         print(f"❌ Gmail API Error: {error_details}", file=sys.stderr)
         return None
 
-    # === Public API Methods ===
-
-    def list_unread(self, max_results: int = 10) -> List[Dict[str, Any]]:
-        """List unread emails"""
-        try:
-            self._ensure_valid_token()
-
-            results = self._execute_with_retry(
-                self.service.users()
-                .messages()
-                .list(userId="me", q="is:unread", maxResults=max_results)
-                .execute
+    @staticmethod
+    def _metadata_request(service, msg_id: str):
+        """Build the messages.get request for a message's Subject/From/Date metadata"""
+        return (
+            service.users()
+            .messages()
+            .get(
+                userId="me",
+                id=msg_id,
+                format="metadata",
+                metadataHeaders=["Subject", "From", "Date"],
+                fields="id,snippet,payload/headers",
             )
+        )
 
-            if not results:
-                return []
+    def _batch_get_metadata(self, msg_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Fetch Subject/From/Date metadata for several messages.
 
-            messages = results.get("messages", [])
-            emails = []
-
-            for msg in messages:
-                msg_data = self._execute_with_retry(
-                    self.service.users()
-                    .messages()
-                    .get(
-                        userId="me",
-                        id=msg["id"],
-                        format="metadata",
-                        metadataHeaders=["Subject", "From", "Date"],
-                    )
-                    .execute
-                )
-
-                if msg_data:
-                    headers = {h["name"]: h["value"] for h in msg_data["payload"]["headers"]}
-                    emails.append(
-                        {
-                            "id": msg["id"],
-                            "subject": headers.get("Subject", "No Subject"),
-                            "from": headers.get("From", "Unknown"),
-                            "date": headers.get("Date", "Unknown"),
-                            "snippet": msg_data.get("snippet", "")[:150],
-                        }
-                    )
+        Requests are grouped into batch HTTP requests so N messages cost one
+        round-trip per BATCH_SIZE instead of N. Messages that fail are
+        reported and skipped; the rest are returned in the order of msg_ids.
+        """
+        responses: Dict[str, Dict[str, Any]] = {}
 
-            return emails
+        def _collect(request_id, response, exception):
+            if exception is not None:
+                self._handle_api_error(exception)
+            elif response:
+                responses[request_id] = response
 
-        except GmailAuthError:
-            return []
+        for start in range(0, len(msg_ids), self.BATCH_SIZE):
+            batch = self.service.new_batch_http_request(callback=_collect)
+            for index, msg_id in enumerate(msg_ids[start : start + self.BATCH_SIZE], start):
+                batch.add(self._metadata_request(self.service, msg_id), request_id=str(index))
+            self._execute_with_retry(batch.execute)
 
-    def list_inbox(self, max_results: int = 10) -> List[Dict[str, Any]]:
-        """List emails in Inbox (has INBOX label)"""
-        try:
-            self._ensure_valid_token()
+        return [responses[str(i)] for i in range(len(msg_ids)) if str(i) in responses]
 
-            results = self._execute_with_retry(
-                self.service.users()
-                .messages()
-                .list(userId="me", q="in:inbox", maxResults=max_results)
-                .execute
-            )
-
-            if not results:
-                return []
-
-            messages = results.get("messages", [])
-            emails = []
-
-            for msg in messages:
-                msg_data = self._execute_with_retry(
-                    self.service.users()
-                    .messages()
-                    .get(
-                        userId="me",
-                        id=msg["id"],
-                        format="metadata",
-                        metadataHeaders=["Subject", "From", "Date"],
-                    )
-                    .execute
-                )
-
-                if msg_data:
-                    headers = {h["name"]: h["value"] for h in msg_data["payload"]["headers"]}
-                    emails.append(
-                        {
-                            "id": msg["id"],
-                            "subject": headers.get("Subject", "No Subject"),
-                            "from": headers.get("From", "Unknown"),
-                            "date": headers.get("Date", "Unknown"),
-                            "snippet": msg_data.get("snippet", "")[:150],
-                        }
-                    )
+    # === Public API Methods ===
 
-            return emails
+    def list_unread(self, max_results: int = 10) -> List[Dict[str, Any]]:
+        """List unread emails"""
+        return self._list_messages(max_results, query="is:unread")
 
-        except GmailAuthError:
-            return []
+    def list_inbox(self, max_results: int = 10) -> List[Dict[str, Any]]:
+        """List emails in Inbox (has INBOX label)"""
+        return self._list_messages(max_results, query="in:inbox")
 
     def list_recent(self, max_results: int = 10) -> List[Dict[str, Any]]:
         """List most recent emails (read or unread)"""
-        try:
-            self._ensure_valid_token()
-
-            results = self._execute_with_retry(
-                self.service.users().messages().list(userId="me", maxResults=max_results).execute
-            )
-
-            if not results:
-                return []
-
-            messages = results.get("messages", [])
-            emails = []
-
-            for msg in messages:
-                msg_data = self._execute_with_retry(
-                    self.service.users()
-                    .messages()
-                    .get(
-                        userId="me",
-                        id=msg["id"],
-                        format="metadata",
-                        metadataHeaders=["Subject", "From", "Date"],
-                    )
-                    .execute
-                )
-
-                if msg_data:
-                    headers = {h["name"]: h["value"] for h in msg_data["payload"]["headers"]}
-                    emails.append(
-                        {
-                            "id": msg["id"],
-                            "subject": headers.get("Subject", "No Subject"),
-                            "from": headers.get("From", "Unknown"),
-                            "date": headers.get("Date", "Unknown"),
-                            "snippet": msg_data.get("snippet", "")[:150],
-                        }
-                    )
-
-            return emails
-
-        except GmailAuthError:
-            return []
+        return self._list_messages(max_results)
 
     def search(self, query: str, max_results: int = 10) -> List[Dict[str, Any]]:
         """Search emails by query"""
+        return self._list_messages(max_results, query=query)
+
+    def _list_messages(self, max_results: int, query: Optional[str] = None) -> List[Dict[str, Any]]:
+        """List messages matching an optional Gmail query, with summary metadata"""
         try:
             self._ensure_valid_token()
 
-            results = self._execute_with_retry(
-                self.service.users().messages().list(userId="me", q=query, maxResults=max_results).execute
-            )
+            # Only the IDs are used; metadata comes from _fetch_messages
+            list_kwargs: Dict[str, Any] = {"userId": "me", "maxResults": max_results, "fields": "messages/id"}
+            if query is not None:
+                list_kwargs["q"] = query
+
+            results = self._execute_with_retry(self.service.users().messages().list(**list_kwargs).execute)
 
             if not results:
                 return []
 
-            messages = results.get("messages", [])
-            emails = []
-
-            for msg in messages:
-                msg_data = self._execute_with_retry(
-                    self.service.users()
-                    .messages()
-                    .get(
-                        userId="me",
-                        id=msg["id"],
-                        format="metadata",
-                        metadataHeaders=["Subject", "From", "Date"],
-                    )
-                    .execute
-                )
-
-                if msg_data:
-                    headers = {h["name"]: h["value"] for h in msg_data["payload"]["headers"]}
-                    emails.append(
-                        {
-                            "id": msg["id"],
-                            "subject": headers.get("Subject", "No Subject"),
-                            "from": headers.get("From", "Unknown"),
-                            "date": headers.get("Date", "Unknown"),
-                            "snippet": msg_data.get("snippet", "")[:150],
-                        }
-                    )
-
-            return emails
+            return self._fetch_messages([msg["id"] for msg in results.get("messages", [])])
 
         except GmailAuthError:
             return []
 
+    def _fetch_messages(self, msg_ids: List[str]) -> List[Dict[str, Any]]:
+        """Fetch messages by ID as summary dicts (id, subject, from, date, snippet)"""
+        emails = []
+        for msg_data in self._batch_get_metadata(msg_ids):
+            # Scan for the three headers used instead of building a dict of all of them
+            subject = sender = date = None
+            for header in msg_data["payload"]["headers"]:
+                name = header["name"]
+                if name == "Subject":
+                    subject = header["value"]
+                elif name == "From":
+                    sender = header["value"]
+                elif name == "Date":
+                    date = header["value"]
+            emails.append(
+                {
+                    "id": msg_data["id"],
+                    "subject": "No Subject" if subject is None else subject,
+                    "from": "Unknown" if sender is None else sender,
+                    "date": "Unknown" if date is None else date,
+                    "snippet": msg_data.get("snippet", "")[:150],
+                }
+            )
+        return emails
+
     def list_labels(self) -> List[Dict[str, Any]]:
         """List Gmail labels"""
         try:
             self._ensure_valid_token()
-            results = self._execute_with_retry(self.service.users().labels().list(userId="me").execute)
+            results = self._execute_with_retry(
+                self.service.users().labels().list(userId="me", fields="labels(id,name)").execute
+            )
             return results.get("labels", []) if results else []
         except GmailAuthError:
             return []
@@ -326,7 +391,11 @@ class GmailClient:
         """Get Gmail profile"""
         try:
             self._ensure_valid_token()
-            return self._execute_with_retry(self.service.users().getProfile(userId="me").execute)
+            return self._execute_with_retry(
+                self.service.users()
+                .getProfile(userId="me", fields="emailAddress,messagesTotal,threadsTotal")
+                .execute
+            )
         except GmailAuthError:
             return None
 
@@ -392,16 +461,45 @@ class GmailClient:
 
         return ""
 
+    @staticmethod
+    def _build_raw(to: str, subject: str, body: str) -> str:
+        """
+        Build a base64url-encoded plain-text RFC 5322 message for the Gmail API.
+
+        Writes the To/Subject/MIME headers and body directly, with CRLF line
+        endings, instead of going through MIMEText and the email generator.
+        Non-ASCII headers are RFC 2047 encoded, long subjects are folded at
+        whitespace, and non-ASCII bodies are base64 encoded. Raises ValueError
+        for a header containing a line break or one that cannot be folded to
+        MAX_HEADER_LINE characters.
+        """
+        for value in (to, subject):
+            if "\r" in value or "\n" in value:
+                raise ValueError(f"Header value contains a line break: {value!r}")
+
+        lines = [f"To: {_encode_addresses('To', to)}", f"Subject: {_encode_header('Subject', subject)}"]
+        if any(len(line) > MAX_HEADER_LINE for header in lines for line in header.split("\r\n")):
+            raise ValueError(f"Header line longer than {MAX_HEADER_LINE} characters")
+        lines.append("MIME-Version: 1.0")
+
+        if body.isascii():
+            lines.append('Content-Type: text/plain; charset="us-ascii"')
+            lines.append("Content-Transfer-Encoding: 7bit")
+            payload = body.replace("\r\n", "\n").replace("\n", "\r\n")
+        else:
+            lines.append('Content-Type: text/plain; charset="utf-8"')
+            lines.append("Content-Transfer-Encoding: base64")
+            payload = base64.encodebytes(body.encode("utf-8")).decode("ascii").replace("\n", "\r\n")
+
+        raw = "\r\n".join(lines) + "\r\n\r\n" + payload
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
     def create_draft(self, to: str, subject: str, body: str) -> Optional[Dict[str, Any]]:
         """Create an email draft"""
         try:
             self._ensure_valid_token()
 
-            message = MIMEText(body)
-            message["to"] = to
-            message["subject"] = subject
-
-            raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode("utf-8")
+            raw_message = self._build_raw(to, subject, body)
             draft_body = {"message": {"raw": raw_message}}
 
             return self._execute_with_retry(
@@ -410,17 +508,16 @@ class GmailClient:
 
         except GmailAuthError:
             return None
+        except ValueError as e:
+            print(f"❌ Invalid message: {e}", file=sys.stderr)
+            return None
 
     def send(self, to: str, subject: str, body: str) -> Optional[Dict[str, Any]]:
         """Send an email immediately"""
         try:
             self._ensure_valid_token()
 
-            message = MIMEText(body)
-            message["to"] = to
-            message["subject"] = subject
-
-            raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode("utf-8")
+            raw_message = self._build_raw(to, subject, body)
             email_body = {"raw": raw_message}
 
             return self._execute_with_retry(
@@ -429,3 +526,6 @@ class GmailClient:
 
         except GmailAuthError:
             return None
+        except ValueError as e:
+            print(f"❌ Invalid message: {e}", file=sys.stderr)
+            return None
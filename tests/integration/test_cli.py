@@ -2,12 +2,24 @@
 Integration tests for CLI interface.
 """
 
+import subprocess
 import sys
 from io import StringIO
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import patch, Mock
 
-from nakimi.cli.main import main
+import pytest
+
+from nakimi.cli.main import (
+    SUBPARSER_BUILDERS,
+    _build_parser,
+    _fast_dispatch,
+    cmd_plugins,
+    load_secrets,
+    main,
+)
+from nakimi.core.plugin import PluginError
 
 
 class TestCLIParsing:
@@ -21,6 +33,65 @@ class TestCLIParsing:
     # Note: parse_args is not exported from main.py
     # We'll test CLI parsing through actual execution tests
 
+    def test_build_parser_only_requested_subcommand(self):
+        """Test only the sniffed subcommand's parser is constructed."""
+        parser = _build_parser(["encrypt", "input.txt", "-o", "output.age"])
+        subparsers = parser._subparsers._group_actions[0]
+
+        assert list(subparsers.choices) == ["encrypt"]
+
+        args = parser.parse_args(["encrypt", "input.txt", "-o", "output.age"])
+        assert args.file == "input.txt"
+        assert args.output == "output.age"
+
+    def test_build_parser_all_subcommands_for_help(self):
+        """Test top-level help and unknown commands build every subparser."""
+        for argv in ([], ["--help"], ["--help", "init"], ["-h", "yubikey"], ["bogus"]):
+            parser = _build_parser(argv)
+            subparsers = parser._subparsers._group_actions[0]
+            assert list(subparsers.choices) == list(SUBPARSER_BUILDERS)
+
+
+class TestFastDispatch:
+    """Test running built-in commands without argparse."""
+
+    def test_cli_import_does_not_load_argparse(self):
+        """Test importing the CLI module leaves argparse unloaded."""
+        code = "import sys, nakimi.cli.main\nassert 'argparse' not in sys.modules\n"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+
+    @patch("nakimi.cli.main._build_parser")
+    def test_fast_path_parses_options(self, mock_build_parser):
+        """Test encrypt options are parsed by the fast path."""
+        mock_handler = Mock()
+        with patch.dict("nakimi.cli.main.COMMAND_HANDLERS", {"encrypt": mock_handler}):
+            assert _fast_dispatch(["encrypt", "--shred", "input.txt", "--output", "out.age"]) is True
+
+        args = mock_handler.call_args.args[0]
+        assert (args.file, args.output, args.shred) == ("input.txt", "out.age", True)
+        mock_build_parser.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "argv",
+        [
+            [],
+            ["--help"],
+            ["encrypt", "--help"],
+            ["encrypt", "--output=out.age", "input.txt"],
+            ["encrypt", "input.txt", "-o"],
+            ["decrypt", "a.age", "b.age"],
+            ["plugins"],
+            ["session", "--shell"],
+            ["yubikey", "status"],
+            ["bogus"],
+        ],
+    )
+    def test_fast_path_falls_back(self, argv):
+        """Test anything beyond the plain command forms is left to argparse."""
+        with patch.dict("nakimi.cli.main.COMMAND_HANDLERS", {k: Mock() for k in SUBPARSER_BUILDERS}):
+            assert _fast_dispatch(argv) is False
+
 
 class TestCLIExecution:
     """Test CLI command execution."""
@@ -105,7 +176,7 @@ class TestCLIExecution:
     @patch("sys.argv", ["nakimi", "plugins", "list"])
     @patch("pathlib.Path.exists")
     @patch("nakimi.cli.main.secure_delete", create=True)
-    @patch("json.load")
+    @patch("nakimi.cli.main._load_json")
     @patch("builtins.open")
     def test_cli_plugins_list(
         self,
@@ -141,7 +212,7 @@ class TestCLIExecution:
         mock_file = Mock()
         mock_open.return_value.__enter__.return_value = mock_file
 
-        # Mock json.load to return secrets
+        # Mock JSON loading to return secrets
         mock_json_load.return_value = {"gmail": {"token": "test"}}
 
         captured_output = StringIO()
@@ -166,7 +237,7 @@ class TestCLIExecution:
     @patch("sys.argv", ["nakimi", "plugins", "commands"])
     @patch("pathlib.Path.exists")
     @patch("nakimi.cli.main.secure_delete", create=True)
-    @patch("json.load")
+    @patch("nakimi.cli.main._load_json")
     @patch("builtins.open")
     def test_cli_plugins_commands(
         self,
@@ -202,7 +273,7 @@ class TestCLIExecution:
         mock_file = Mock()
         mock_open.return_value.__enter__.return_value = mock_file
 
-        # Mock json.load to return secrets
+        # Mock JSON loading to return secrets
         mock_json_load.return_value = {"gmail": {"token": "test"}}
 
         captured_output = StringIO()
@@ -225,7 +296,7 @@ class TestCLIExecution:
     @patch("sys.argv", ["nakimi", "gmail.unread", "5"])
     @patch("pathlib.Path.exists")
     @patch("nakimi.cli.main.secure_delete", create=True)
-    @patch("json.load")
+    @patch("nakimi.cli.main._load_json")
     @patch("builtins.open")
     def test_cli_plugin_command(
         self,
@@ -261,7 +332,7 @@ class TestCLIExecution:
         mock_file = Mock()
         mock_open.return_value.__enter__.return_value = mock_file
 
-        # Mock json.load to return secrets
+        # Mock JSON loading to return secrets
         mock_json_load.return_value = {"gmail": {"token": "test"}}
 
         captured_output = StringIO()
@@ -283,7 +354,7 @@ class TestCLIExecution:
     @patch("sys.argv", ["nakimi", "gmail.unread"])
     @patch("pathlib.Path.exists")
     @patch("nakimi.cli.main.secure_delete", create=True)
-    @patch("json.load")
+    @patch("nakimi.cli.main._load_json")
     @patch("builtins.open")
     def test_cli_plugin_command_error(
         self,
@@ -321,7 +392,7 @@ class TestCLIExecution:
         mock_file = Mock()
         mock_open.return_value.__enter__.return_value = mock_file
 
-        # Mock json.load to return secrets
+        # Mock JSON loading to return secrets
         mock_json_load.return_value = {"gmail": {"token": "test"}}
 
         captured_output = StringIO()
@@ -344,7 +415,7 @@ class TestCLIExecution:
     @patch("sys.argv", ["nakimi", "unknown.command"])
     @patch("pathlib.Path.exists")
     @patch("nakimi.cli.main.secure_delete", create=True)
-    @patch("json.load")
+    @patch("nakimi.cli.main._load_json")
     @patch("builtins.open")
     def test_cli_unknown_command(
         self,
@@ -382,7 +453,7 @@ class TestCLIExecution:
         mock_file = Mock()
         mock_open.return_value.__enter__.return_value = mock_file
 
-        # Mock json.load to return secrets
+        # Mock JSON loading to return secrets
         mock_json_load.return_value = {"gmail": {"token": "test"}}
 
         captured_output = StringIO()
@@ -435,3 +506,38 @@ class TestCLIExecution:
 
         output = captured_output.getvalue()
         assert "session" in output
+
+
+class TestLoadSecrets:
+    """Test secrets loading."""
+
+    def test_load_secrets_rejects_non_object(self, temp_dir, monkeypatch):
+        """Test a secrets file that is not a JSON object is rejected."""
+        secrets_file = temp_dir / "secrets.json"
+        secrets_file.write_text("[]")
+        monkeypatch.setenv("NAKIMI_SECRETS", str(secrets_file))
+
+        with pytest.raises(PluginError, match="must contain a JSON object"):
+            load_secrets()
+
+    def test_load_secrets_plaintext(self, mock_secrets_file, mock_secrets, monkeypatch):
+        """Test a plaintext secrets file is loaded as a dict."""
+        monkeypatch.setenv("NAKIMI_SECRETS", str(mock_secrets_file))
+
+        assert load_secrets() == mock_secrets
+
+
+class TestCLIOutput:
+    """Test CLI output batching."""
+
+    @patch("nakimi.cli.main.load_secrets", return_value={})
+    @patch("nakimi.cli.main.PluginManager")
+    def test_plugins_commands_single_write(self, mock_pm_class, mock_load_secrets):
+        """Test the command listing is written to stdout in one call."""
+        mock_pm_class.return_value.list_commands.return_value = ["gmail.unread", "gmail.search"]
+        mock_stdout = Mock()
+
+        with patch("sys.stdout", mock_stdout):
+            cmd_plugins(SimpleNamespace(command="commands"))
+
+        mock_stdout.write.assert_called_once_with("Available commands:\n  gmail.search\n  gmail.unread\n")
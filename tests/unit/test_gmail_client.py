@@ -0,0 +1,439 @@
+"""
+Unit tests for client.py - Gmail API client.
+"""
+
+import base64
+import email
+import json
+import subprocess
+import sys
+import time
+from datetime import timedelta
+from email import policy
+from email.header import decode_header, make_header
+
+import pytest
+from unittest.mock import Mock, patch
+
+from nakimi.core.config import reset_config
+from nakimi.plugins.gmail import client as gmail_client
+from nakimi.plugins.gmail.client import GmailClient
+
+SECRETS = {"client_id": "test-id", "client_secret": "test-secret", "refresh_token": "test-refresh"}
+
+
+class TestLazyGoogleImport:
+    """Test deferred import of the Google API libraries."""
+
+    def test_module_import_does_not_load_google_libs(self):
+        """Test importing the client module leaves googleapiclient unloaded."""
+        code = (
+            "import sys\n"
+            "import nakimi.plugins.gmail.client\n"
+            "assert 'googleapiclient.discovery' not in sys.modules\n"
+            "assert 'google.oauth2.credentials' not in sys.modules\n"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+
+    def test_package_exports_resolve_lazily(self):
+        """Test the gmail package defers loading its plugin and client modules."""
+        code = (
+            "import sys\n"
+            "import nakimi, nakimi.plugins.gmail as gmail\n"
+            "assert 'nakimi.core' not in sys.modules\n"
+            "assert 'nakimi.plugins.gmail.client' not in sys.modules\n"
+            "assert gmail.GmailAuthError.__module__ == 'nakimi.plugins.gmail.client'\n"
+            "assert nakimi.PluginError.__module__ == 'nakimi.core.plugin'\n"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+
+    def test_lazy_import_populates_symbols(self):
+        """Test the helper caches the Google symbols on first use."""
+        assert gmail_client._lazy_import_google() is True
+        assert gmail_client.GOOGLE_LIBS_AVAILABLE is True
+        assert gmail_client._Credentials is not None
+        assert gmail_client._HttpError is not None
+
+    def test_client_requires_google_libs(self):
+        """Test GmailClient raises ImportError when the libraries are missing."""
+        with patch.object(gmail_client, "GOOGLE_LIBS_AVAILABLE", False):
+            with pytest.raises(ImportError, match="Google API libraries not installed"):
+                GmailClient(SECRETS)
+
+
+class FakeCredentials:
+    """Stand-in for google.oauth2.credentials.Credentials."""
+
+    refresh_count = 0
+
+    def __init__(self, token=None, **kwargs):
+        self.token = token
+        self.expiry = None
+
+    @property
+    def valid(self):
+        return self.token is not None and self.expiry > gmail_client._utcnow()
+
+    def refresh(self, request):
+        FakeCredentials.refresh_count += 1
+        self.token = f"fresh-token-{FakeCredentials.refresh_count}"
+        self.expiry = gmail_client._utcnow() + timedelta(hours=1)
+
+
+@pytest.fixture
+def gmail_env(temp_dir, monkeypatch):
+    """Patch the Google libraries and point the vault at a temp directory."""
+    monkeypatch.setenv("NAKIMI_DIR", str(temp_dir / ".nakimi"))
+    reset_config()
+    FakeCredentials.refresh_count = 0
+
+    gmail_client._lazy_import_google()
+    monkeypatch.setattr(gmail_client, "_Credentials", FakeCredentials)
+    monkeypatch.setattr(gmail_client, "_Request", Mock())
+    monkeypatch.setattr(gmail_client, "_build_from_document", Mock())
+    monkeypatch.setattr(gmail_client, "_gmail_discovery_doc", "{}")
+    monkeypatch.setattr(gmail_client, "_CREDENTIALS_CACHE", {})
+    yield temp_dir / ".nakimi"
+    reset_config()
+
+
+class TestServiceBuild:
+    """Test construction of the Gmail service object."""
+
+    def test_service_uses_bundled_discovery(self, gmail_env):
+        """Test the service is built from the bundled discovery document."""
+        client = GmailClient(SECRETS)
+
+        gmail_client._build_from_document.assert_called_once_with("{}", credentials=client.creds)
+
+    def test_discovery_doc_loaded_once(self, monkeypatch):
+        """Test the bundled discovery document is read once per process."""
+        monkeypatch.setattr(gmail_client, "_gmail_discovery_doc", None)
+
+        first = gmail_client._get_gmail_discovery_doc()
+
+        assert json.loads(first)["name"] == "gmail"
+        assert gmail_client._get_gmail_discovery_doc() is first
+
+
+class TestCredentialsCache:
+    """Test sharing credentials between clients in one process."""
+
+    def test_credentials_reused_within_process(self, gmail_env):
+        """Test a second client reuses the token but builds its own service."""
+        first = GmailClient(SECRETS)
+        second = GmailClient(SECRETS)
+
+        assert second.creds is first.creds
+        assert FakeCredentials.refresh_count == 1
+        assert gmail_client._build_from_document.call_count == 2
+
+    def test_stale_cached_credentials_refreshed(self, gmail_env):
+        """Test cached credentials with an expiring token are refreshed."""
+        first = GmailClient(SECRETS)
+        first.creds.expiry = gmail_client._utcnow() + timedelta(minutes=1)
+
+        second = GmailClient(SECRETS)
+
+        assert FakeCredentials.refresh_count == 2
+        assert second.creds.token == "fresh-token-2"
+
+    def test_different_credentials_not_shared(self, gmail_env):
+        """Test clients for different accounts get their own credentials."""
+        first = GmailClient(SECRETS)
+        second = GmailClient({**SECRETS, "refresh_token": "other-token"})
+
+        assert second.creds is not first.creds
+        assert FakeCredentials.refresh_count == 2
+
+
+class TestTokenStorage:
+    """Test the OAuth access token is kept in memory only."""
+
+    def test_token_not_written_to_disk(self, gmail_env):
+        """Test authenticating leaves nothing in the vault directory."""
+        client = GmailClient(SECRETS)
+
+        assert client.creds.token == "fresh-token-1"
+        assert not gmail_env.exists() or list(gmail_env.iterdir()) == []
+
+    def test_new_process_refreshes(self, gmail_env):
+        """Test a client in a new process fetches its own token."""
+        GmailClient(SECRETS)
+        gmail_client._CREDENTIALS_CACHE.clear()  # as in a new process
+
+        client = GmailClient(SECRETS)
+
+        assert FakeCredentials.refresh_count == 2
+        assert client.creds.token == "fresh-token-2"
+
+
+class FakeBatch:
+    """Stand-in for googleapiclient.http.BatchHttpRequest."""
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request, request_id))
+
+    def execute(self):
+        # Deliver responses out of order, like the real batch endpoint may
+        for request, request_id in reversed(self.requests):
+            if request["id"] == "broken":
+                self.callback(request_id, None, Exception("boom"))
+            else:
+                self.callback(request_id, make_message(request["id"]), None)
+
+
+def make_message(msg_id):
+    """Build a metadata-format message resource."""
+    return {
+        "id": msg_id,
+        "snippet": f"Snippet {msg_id}",
+        "payload": {
+            "headers": [
+                {"name": "Subject", "value": f"Subject {msg_id}"},
+                {"name": "From", "value": "sender@example.com"},
+                {"name": "Date", "value": "Thu, 1 Jan 2026 00:00:00 +0000"},
+            ]
+        },
+    }
+
+
+@pytest.fixture
+def batch_service(gmail_env):
+    """Configure the mocked Gmail service to list messages and serve batches."""
+    service = gmail_client._build_from_document.return_value
+    batches = []
+
+    def new_batch(callback):
+        batches.append(FakeBatch(callback))
+        return batches[-1]
+
+    messages = service.users.return_value.messages.return_value
+    messages.get.side_effect = lambda **kwargs: kwargs
+    service.new_batch_http_request.side_effect = new_batch
+    service.batches = batches
+    return service
+
+
+class TestEnsureValidToken:
+    """Test the in-process token validity short-circuit."""
+
+    def test_fresh_token_skips_expiry_check(self, gmail_env):
+        """Test no datetime checks run while the monotonic deadline holds."""
+        client = GmailClient(SECRETS)
+
+        with patch.object(client, "_token_is_stale") as mock_stale:
+            client._ensure_valid_token()
+
+        mock_stale.assert_not_called()
+        assert FakeCredentials.refresh_count == 1
+
+    def test_deadline_leaves_refresh_margin(self, gmail_env):
+        """Test the deadline ends TOKEN_REFRESH_MARGIN seconds before expiry."""
+        client = GmailClient(SECRETS)
+
+        remaining = client._valid_until_mono - time.monotonic()
+        expected = 3600 - GmailClient.TOKEN_REFRESH_MARGIN
+        assert expected - 5 < remaining <= expected
+
+    def test_expired_deadline_refreshes(self, gmail_env):
+        """Test the slow path refreshes once the deadline has passed."""
+        client = GmailClient(SECRETS)
+        client._valid_until_mono = 0.0
+        client.creds.expiry = gmail_client._utcnow() + timedelta(minutes=1)
+
+        client._ensure_valid_token()
+
+        assert FakeCredentials.refresh_count == 2
+        assert client._valid_until_mono > time.monotonic()
+
+
+class TestTokenRefresh:
+    """Test refreshing the access token after the API rejects it."""
+
+    def _unauthorized(self):
+        return gmail_client._HttpError(Mock(status=401, reason="Unauthorized"), b"")
+
+    def test_rejected_token_refreshed_once(self, gmail_env):
+        """Test a second refresh for an already replaced token is skipped."""
+        client = GmailClient(SECRETS)
+        rejected = client.creds.token
+
+        client._refresh_token(rejected_token=rejected)
+        client._refresh_token(rejected_token=rejected)
+
+        assert FakeCredentials.refresh_count == 2
+        assert client.creds.token == "fresh-token-2"
+
+    def test_unauthorized_call_retried_after_refresh(self, gmail_env):
+        """Test a 401 refreshes the token that was rejected and retries the call."""
+        client = GmailClient(SECRETS)
+        api_call = Mock(side_effect=[self._unauthorized(), {"ok": True}])
+
+        assert client._execute_with_retry(api_call) == {"ok": True}
+        assert FakeCredentials.refresh_count == 2
+        assert api_call.call_count == 2
+
+
+class TestBatchMetadata:
+    """Test batched metadata fetching for list commands."""
+
+    def _set_listed_ids(self, service, msg_ids):
+        messages = service.users.return_value.messages.return_value
+        messages.list.return_value.execute.return_value = {"messages": [{"id": i} for i in msg_ids]}
+
+    def test_list_unread_uses_single_batch(self, batch_service):
+        """Test list_unread fetches all metadata in one batch, in order."""
+        self._set_listed_ids(batch_service, ["a", "b", "c"])
+        client = GmailClient(SECRETS)
+
+        emails = client.list_unread(max_results=3)
+
+        assert len(batch_service.batches) == 1
+        assert [e["id"] for e in emails] == ["a", "b", "c"]
+        assert emails[0] == {
+            "id": "a",
+            "subject": "Subject a",
+            "from": "sender@example.com",
+            "date": "Thu, 1 Jan 2026 00:00:00 +0000",
+            "snippet": "Snippet a",
+        }
+
+    def test_missing_and_extra_headers(self, gmail_env):
+        """Test header defaults and that unrelated headers are ignored."""
+        client = GmailClient(SECRETS)
+        message = {
+            "id": "x",
+            "payload": {
+                "headers": [
+                    {"name": "To", "value": "me@example.com"},
+                    {"name": "Subject", "value": ""},
+                ]
+            },
+        }
+
+        with patch.object(client, "_batch_get_metadata", return_value=[message]):
+            emails = client._fetch_messages(["x"])
+
+        assert emails == [{"id": "x", "subject": "", "from": "Unknown", "date": "Unknown", "snippet": ""}]
+
+    def test_partial_responses_requested(self, batch_service):
+        """Test list and metadata requests ask only for the fields that are used."""
+        self._set_listed_ids(batch_service, ["a"])
+        client = GmailClient(SECRETS)
+
+        client.list_inbox(max_results=1)
+
+        messages = batch_service.users.return_value.messages.return_value
+        assert messages.list.call_args.kwargs["fields"] == "messages/id"
+        assert messages.get.call_args.kwargs["fields"] == "id,snippet,payload/headers"
+
+    def test_batches_split_at_batch_size(self, batch_service):
+        """Test more messages than BATCH_SIZE are split across batches."""
+        msg_ids = [f"m{i}" for i in range(GmailClient.BATCH_SIZE + 5)]
+        self._set_listed_ids(batch_service, msg_ids)
+        client = GmailClient(SECRETS)
+
+        emails = client.search("label:work", max_results=len(msg_ids))
+
+        assert [len(b.requests) for b in batch_service.batches] == [GmailClient.BATCH_SIZE, 5]
+        assert [e["id"] for e in emails] == msg_ids
+
+    def test_failed_message_skipped(self, batch_service, capsys):
+        """Test a failing sub-request is reported and the rest are returned."""
+        self._set_listed_ids(batch_service, ["a", "broken", "c"])
+        client = GmailClient(SECRETS)
+
+        emails = client.list_recent(max_results=3)
+
+        assert [e["id"] for e in emails] == ["a", "c"]
+        assert "boom" in capsys.readouterr().err
+
+
+class TestBuildRaw:
+    """Test building raw RFC 5322 messages for draft/send."""
+
+    def _parse(self, raw):
+        return email.message_from_bytes(base64.urlsafe_b64decode(raw), policy=policy.default)
+
+    def test_ascii_message(self):
+        """Test a plain ASCII message round-trips through the email parser."""
+        msg = self._parse(GmailClient._build_raw("to@example.com", "Hello", "Line 1\nLine 2"))
+
+        assert msg["To"] == "to@example.com"
+        assert msg["Subject"] == "Hello"
+        assert msg["Content-Transfer-Encoding"] == "7bit"
+        assert msg.get_content_type() == "text/plain"
+        assert msg.get_content().splitlines() == ["Line 1", "Line 2"]
+
+    def test_non_ascii_message(self):
+        """Test non-ASCII subject, display name and body are encoded."""
+        raw = GmailClient._build_raw("José <jose@example.com>", "Olá mundo", "Café ☕")
+        assert b"=?utf-8?" in base64.urlsafe_b64decode(raw)
+
+        msg = self._parse(raw)
+        assert msg["To"] == "José <jose@example.com>"
+        assert msg["To"].addresses[0].addr_spec == "jose@example.com"
+        assert msg["Subject"] == "Olá mundo"
+        assert msg.get_content() == "Café ☕"
+
+    def test_long_subject_folded(self):
+        """Test a subject longer than a header line is folded at whitespace."""
+        subject = " ".join(["word"] * 300)
+        raw = base64.urlsafe_b64decode(GmailClient._build_raw("to@example.com", subject, "Body"))
+        headers = raw.split(b"\r\n\r\n", 1)[0].split(b"\r\n")
+
+        assert max(len(line) for line in headers) <= 78
+        assert self._parse(GmailClient._build_raw("to@example.com", subject, "Body"))["Subject"] == subject
+
+    def test_unfoldable_header_rejected(self):
+        """Test a header that cannot be folded under the line limit is rejected."""
+        with pytest.raises(ValueError, match="longer than 998"):
+            GmailClient._build_raw("to@example.com", "x" * 1200, "Body")
+
+    @pytest.mark.parametrize("field", ["to", "subject"])
+    def test_header_injection_rejected(self, field):
+        """Test header values containing line breaks are rejected."""
+        args = {"to": "to@example.com", "subject": "Hi", "body": "Body"}
+        args[field] += "\r\nBcc: attacker@example.com"
+
+        with pytest.raises(ValueError, match="line break"):
+            GmailClient._build_raw(**args)
+
+    @pytest.mark.parametrize("to", ["josé@example.com", "José@", "Ann <ann@example.com>, José@"])
+    def test_non_ascii_address_encoded(self, to):
+        """Test a non-ASCII or unparseable addr-spec is RFC 2047 encoded, never dropped."""
+        raw = base64.urlsafe_b64decode(GmailClient._build_raw(to, "Hi", "Body"))
+        to_header = raw.split(b"\r\n", 1)[0].decode("ascii")
+
+        assert to_header.startswith("To: =?utf-8?")
+        assert str(make_header(decode_header(to_header[len("To: ") :]))) == to
+
+    @pytest.mark.parametrize("method", ["send", "create_draft"])
+    def test_invalid_message_reported(self, gmail_env, method, capsys):
+        """Test draft/send report a rejected header and return None."""
+        client = GmailClient(SECRETS)
+
+        result = getattr(client, method)("to@example.com", "Hi\nBcc: attacker@example.com", "Body")
+
+        assert result is None
+        assert "Invalid message" in capsys.readouterr().err
+        users = gmail_client._build_from_document.return_value.users.return_value
+        assert not users.messages.return_value.send.called
+        assert not users.drafts.return_value.create.called
+
+    def test_send_uses_raw_message(self, gmail_env):
+        """Test send() submits the built message."""
+        client = GmailClient(SECRETS)
+
+        client.send("to@example.com", "Hello", "Body")
+
+        send = gmail_client._build_from_document.return_value.users.return_value.messages.return_value.send
+        raw = send.call_args.kwargs["body"]["raw"]
+        assert raw == GmailClient._build_raw("to@example.com", "Hello", "Body")